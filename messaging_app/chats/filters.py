@@ -1,7 +1,7 @@
 # messaging_app/chats/filters.py
 
 import django_filters
-from django.db.models import Q
+from django.db.models import Count, Q
 from django_filters import rest_framework as filters
 from .models import User, Conversation, Message
 
@@ -350,16 +350,16 @@ class ConversationParticipantFilter(filters.FilterSet):
         if users.count() != len(usernames):
             return queryset.none()
         
-        # Get conversations that have exactly these participants
-        conversations = queryset.filter(participants__in=users).annotate(
-            participant_count=django_filters.Count('participants')
-        ).filter(participant_count=len(usernames))
+        # Get conversations that include all of these participants (others may
+        # also be present). Grouping the participants table by conversation
+        # already yields unique ids.
+        conversation_ids = Conversation.participants.through.objects.filter(
+            user__in=users
+        ).values('conversation_id').annotate(
+            matched=Count('user')
+        ).filter(matched=len(usernames)).values('conversation_id')
         
-        # Ensure all specified users are participants
-        for user in users:
-            conversations = conversations.filter(participants=user)
-        
-        return conversations.distinct()
+        return queryset.filter(conversation_id__in=conversation_ids)
     
     def filter_includes_all_users(self, queryset, name, value):
         """
@@ -368,11 +368,12 @@ class ConversationParticipantFilter(filters.FilterSet):
         usernames = [username.strip() for username in value.split(',')]
         users = User.objects.filter(username__in=usernames, is_active=True)
         
+        # Each join matches at most one participant row, so no duplicates
         conversations = queryset
         for user in users:
             conversations = conversations.filter(participants=user)
         
-        return conversations.distinct()
+        return conversations
     
     def filter_includes_any_user(self, queryset, name, value):
         """
@@ -381,4 +382,8 @@ class ConversationParticipantFilter(filters.FilterSet):
         usernames = [username.strip() for username in value.split(',')]
         users = User.objects.filter(username__in=usernames, is_active=True)
         
-        return queryset.filter(participants__in=users).distinct()
\ No newline at end of file
+        # Semi-join on the participants table instead of join + DISTINCT
+        conversation_ids = Conversation.participants.through.objects.filter(
+            user__in=users
+        ).values('conversation_id')
+        return queryset.filter(conversation_id__in=conversation_ids)
\ No newline at end of file
@@ -3,6 +3,7 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
 from django.utils import timezone
+from django.utils.functional import cached_property
 import uuid
 
 
@@ -20,6 +21,11 @@ class User(AbstractUser):
     
     def __str__(self):
         return f"{self.username} ({self.first_name} {self.last_name})"
+    
+    @cached_property
+    def full_name(self):
+        """First and last name joined, computed once per instance"""
+        return f"{self.first_name} {self.last_name}".strip()
 
 
 class Conversation(models.Model):
@@ -28,6 +34,14 @@ class Conversation(models.Model):
     """
     conversation_id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     participants = models.ManyToManyField(User, related_name='conversations')
+    # Denormalized pointer to the newest message, maintained by Message.save/delete
+    last_message = models.ForeignKey(
+        'Message',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+'
+    )
     created_at = models.DateTimeField(default=timezone.now)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -46,6 +60,34 @@ class Conversation(models.Model):
         return self.messages.order_by('-sent_at').first()
 
 
+def _repoint_last_message(conversation_ids):
+    """
+    Point each given conversation whose last_message was nulled by a delete
+    at its newest remaining message, in a single UPDATE
+    """
+    Conversation.objects.filter(
+        pk__in=conversation_ids,
+        last_message__isnull=True
+    ).update(last_message=models.Subquery(
+        Message.objects.filter(
+            conversation=models.OuterRef('pk')
+        ).order_by('-sent_at').values('pk')[:1]
+    ))
+
+
+class MessageQuerySet(models.QuerySet):
+    def delete(self):
+        """
+        Bulk delete that repoints last_message like Message.delete does.
+        Cascades from a deleted sender bypass this and leave last_message
+        NULL until the conversation's next message is saved.
+        """
+        conversation_ids = set(self.values_list('conversation_id', flat=True))
+        result = super().delete()
+        _repoint_last_message(conversation_ids)
+        return result
+
+
 class Message(models.Model):
     """
     Model to represent individual messages within conversations
@@ -64,15 +106,43 @@ class Message(models.Model):
     message_body = models.TextField()
     sent_at = models.DateTimeField(default=timezone.now)
     
+    objects = MessageQuerySet.as_manager()
+    
     class Meta:
         ordering = ['-sent_at']
+        indexes = [
+            # Backs per-conversation history and latest-message lookups
+            models.Index(fields=['conversation', '-sent_at'], name='message_conv_sent_idx'),
+        ]
     
     def __str__(self):
         return f"{self.sender.username}: {self.message_body[:50]}..."
     
     def save(self, *args, **kwargs):
-        """Override save to update conversation's updated_at timestamp"""
+        """Override save to update conversation's updated_at timestamp and last_message"""
+        adding = self._state.adding
         super().save(*args, **kwargs)
-        # Update the conversation's updated_at field when a new message is added
-        self.conversation.updated_at = self.sent_at
-        self.conversation.save(update_fields=['updated_at'])
\ No newline at end of file
+        
+        # Bump the conversation's updated_at, and on insert point it at this
+        # message unless a newer one exists, all in one UPDATE
+        changes = {'updated_at': timezone.now()}
+        if adding:
+            older_messages = Message.objects.filter(
+                conversation_id=self.conversation_id,
+                sent_at__lte=self.sent_at
+            ).values('pk')
+            changes['last_message'] = models.Case(
+                models.When(
+                    models.Q(last_message__isnull=True) | models.Q(last_message__in=older_messages),
+                    then=models.Value(self.pk)
+                ),
+                default=models.F('last_message'),
+                output_field=models.UUIDField()
+            )
+        Conversation.objects.filter(pk=self.conversation_id).update(**changes)
+    
+    def delete(self, *args, **kwargs):
+        """Override delete to repoint the conversation's last_message"""
+        result = super().delete(*args, **kwargs)
+        _repoint_last_message([self.conversation_id])
+        return result
\ No newline at end of file
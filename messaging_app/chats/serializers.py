@@ -1,14 +1,32 @@
 # messaging_app/chats/serializers.py
 
+from django.db.models import Prefetch
 from rest_framework import serializers
 from .models import User, Conversation, Message
 
 
+class EagerLoadingSerializerMixin:
+    """
+    Mixin letting views load exactly the relations a serializer reads.
+    Serializers list them in Meta.select_related / Meta.prefetch_related
+    and views call Serializer.setup_eager_loading(queryset).
+    """
+    @classmethod
+    def setup_eager_loading(cls, queryset):
+        select_related = getattr(cls.Meta, 'select_related', ())
+        prefetch_related = getattr(cls.Meta, 'prefetch_related', ())
+        if select_related:
+            queryset = queryset.select_related(*select_related)
+        if prefetch_related:
+            queryset = queryset.prefetch_related(*prefetch_related)
+        return queryset
+
+
 class UserSerializer(serializers.ModelSerializer):
     """
     Serializer for User model with essential fields
     """
-    # Add CharField for computed full name
+    # CharField for the computed full name (User.full_name)
     full_name = serializers.CharField(read_only=True)
     
     class Meta:
@@ -18,15 +36,9 @@ class UserSerializer(serializers.ModelSerializer):
             'last_name', 'phone_number', 'full_name', 'created_at'
         ]
         read_only_fields = ['user_id', 'created_at']
-    
-    def to_representation(self, instance):
-        data = super().to_representation(instance)
-        # Compute full_name using CharField
-        data['full_name'] = f"{instance.first_name} {instance.last_name}".strip()
-        return data
 
 
-class MessageSerializer(serializers.ModelSerializer):
+class MessageSerializer(EagerLoadingSerializerMixin, serializers.ModelSerializer):
     """
     Serializer for Message model with sender details
     """
@@ -44,6 +56,7 @@ class MessageSerializer(serializers.ModelSerializer):
             'message_body', 'message_preview', 'sent_at'
         ]
         read_only_fields = ['message_id', 'sent_at']
+        select_related = ('sender', 'conversation')
     
     def to_representation(self, instance):
         data = super().to_representation(instance)
@@ -58,25 +71,23 @@ class MessageSerializer(serializers.ModelSerializer):
         """
         sender_data = validated_data.pop('sender', {})
         sender_id = sender_data.get('user_id')
+        conversation = validated_data['conversation']
         
+        # Resolve the sender and verify they are a participant in one query
+        sender = None
         if sender_id:
-            try:
-                sender = User.objects.get(user_id=sender_id)
-                validated_data['sender'] = sender
-            except User.DoesNotExist:
-                raise serializers.ValidationError("Invalid sender ID")
+            sender = conversation.participants.filter(user_id=sender_id).first()
         
-        # Verify sender is participant in the conversation
-        conversation = validated_data['conversation']
-        if not conversation.participants.filter(user_id=sender.user_id).exists():
+        if sender is None:
             raise serializers.ValidationError(
-                "Sender must be a participant in the conversation"
+                "Invalid sender ID or sender is not a participant in the conversation"
             )
         
+        validated_data['sender'] = sender
         return super().create(validated_data)
 
 
-class ConversationSerializer(serializers.ModelSerializer):
+class ConversationSerializer(EagerLoadingSerializerMixin, serializers.ModelSerializer):
     """
     Serializer for Conversation model with participants and messages
     Enhanced with proper nested relationships and CharField usage
@@ -90,7 +101,7 @@ class ConversationSerializer(serializers.ModelSerializer):
     )
     messages = MessageSerializer(many=True, read_only=True)
     latest_message = serializers.SerializerMethodField()
-    message_count = serializers.SerializerMethodField()
+    message_count = serializers.IntegerField(read_only=True, default=0)
     
     # CharField additions for enhanced functionality
     conversation_title = serializers.CharField(
@@ -110,6 +121,11 @@ class ConversationSerializer(serializers.ModelSerializer):
             'created_at', 'updated_at'
         ]
         read_only_fields = ['conversation_id', 'created_at', 'updated_at']
+        select_related = ('last_message__sender',)
+        prefetch_related = (
+            'participants',
+            Prefetch('messages', queryset=Message.objects.select_related('sender')),
+        )
     
     def to_representation(self, instance):
         data = super().to_representation(instance)
@@ -120,24 +136,21 @@ class ConversationSerializer(serializers.ModelSerializer):
     
     def get_latest_message(self, obj):
         """Get the latest message in the conversation with nested sender info"""
-        latest = obj.latest_message
+        # Denormalized last_message, select_related with its sender by the views
+        latest = obj.last_message
         if latest:
             return {
                 'message_id': latest.message_id,
                 'sender': {
                     'user_id': latest.sender.user_id,
                     'username': latest.sender.username,
-                    'full_name': f"{latest.sender.first_name} {latest.sender.last_name}".strip()
+                    'full_name': latest.sender.full_name
                 },
                 'message_body': latest.message_body,
                 'sent_at': latest.sent_at
             }
         return None
     
-    def get_message_count(self, obj):
-        """Get total number of messages in the conversation"""
-        return obj.messages.count()
-    
     def create(self, validated_data):
         """
         Create a new conversation with specified participants
@@ -166,7 +179,7 @@ class ConversationSerializer(serializers.ModelSerializer):
         return conversation
 
 
-class ConversationListSerializer(serializers.ModelSerializer):
+class ConversationListSerializer(EagerLoadingSerializerMixin, serializers.ModelSerializer):
     """
     Simplified serializer for listing conversations without full message details
     Optimized nested relationships for list views
@@ -174,7 +187,7 @@ class ConversationListSerializer(serializers.ModelSerializer):
     # Nested relationship: Include participant info but not full message details
     participants = UserSerializer(many=True, read_only=True)
     latest_message = serializers.SerializerMethodField()
-    message_count = serializers.SerializerMethodField()
+    message_count = serializers.IntegerField(read_only=True, default=0)
     
     # CharField for display purposes
     display_name = serializers.CharField(read_only=True)
@@ -187,20 +200,28 @@ class ConversationListSerializer(serializers.ModelSerializer):
             'message_count', 'display_name', 'last_activity',
             'created_at', 'updated_at'
         ]
+        select_related = ('last_message__sender',)
+        prefetch_related = ('participants',)
     
     def to_representation(self, instance):
         data = super().to_representation(instance)
         
-        # Create display name using CharField
-        participant_names = [p.username for p in instance.participants.all()[:3]]
-        if len(instance.participants.all()) > 3:
-            data['display_name'] = f"{', '.join(participant_names)} and {len(instance.participants.all()) - 3} others"
+        # Create display name using CharField (evaluate the participants once)
+        participants = list(instance.participants.all())
+        participant_names = [p.username for p in participants[:3]]
+        extra = len(participants) - 3
+        if extra > 0:
+            data['display_name'] = f"{', '.join(participant_names)} and {extra} others"
         else:
             data['display_name'] = ', '.join(participant_names) if participant_names else 'Empty conversation'
         
-        # Format last activity using CharField
-        if hasattr(instance, 'updated_at') and instance.updated_at:
-            data['last_activity'] = instance.updated_at.strftime("%Y-%m-%d %H:%M")
+        # Format last activity using CharField ("%Y-%m-%d %H:%M" without strftime)
+        updated_at = instance.updated_at
+        if updated_at:
+            data['last_activity'] = (
+                f"{updated_at.year:04d}-{updated_at.month:02d}-{updated_at.day:02d} "
+                f"{updated_at.hour:02d}:{updated_at.minute:02d}"
+            )
         else:
             data['last_activity'] = "No recent activity"
         
@@ -208,21 +229,19 @@ class ConversationListSerializer(serializers.ModelSerializer):
     
     def get_latest_message(self, obj):
         """Get the latest message summary with nested sender info"""
-        latest = obj.latest_message
+        # Denormalized last_message, select_related with its sender by the views
+        latest = obj.last_message
         if latest:
+            body = latest.message_body
             return {
                 'sender': {
                     'username': latest.sender.username,
-                    'full_name': f"{latest.sender.first_name} {latest.sender.last_name}".strip()
+                    'full_name': latest.sender.full_name
                 },
-                'message_body': latest.message_body[:100] + '...' if len(latest.message_body) > 100 else latest.message_body,
+                'message_body': body[:100] + '...' if len(body) > 100 else body,
                 'sent_at': latest.sent_at
             }
         return None
-    
-    def get_message_count(self, obj):
-        """Get total number of messages in the conversation"""
-        return obj.messages.count()
 
 
 # Additional serializer demonstrating CharField usage for search/filtering
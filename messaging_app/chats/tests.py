@@ -1,3 +1,118 @@
+from datetime import timedelta
+
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from .filters import ConversationParticipantFilter
+from .models import User, Conversation, Message
+from .serializers import ConversationListSerializer
+
+
+def make_user(username):
+    return User.objects.create_user(
+        username=username,
+        email=f"{username}@example.com",
+        password="pass123",
+        first_name=username.title(),
+        last_name="Test",
+    )
+
+
+class ConversationParticipantFilterTest(TestCase):
+    def setUp(self):
+        self.alice = make_user("alice")
+        self.bob = make_user("bob")
+        self.carol = make_user("carol")
+
+        self.direct = Conversation.objects.create()
+        self.direct.participants.add(self.alice, self.bob)
+        self.group = Conversation.objects.create()
+        self.group.participants.add(self.alice, self.bob, self.carol)
+        self.other = Conversation.objects.create()
+        self.other.participants.add(self.alice, self.carol)
+
+    def filter_between(self, value):
+        filterset = ConversationParticipantFilter(
+            {'between_users': value}, queryset=Conversation.objects.all()
+        )
+        return set(filterset.qs)
+
+    def test_between_users_matches_conversations_including_all_users(self):
+        """Conversations with extra participants still match, as before the GROUP BY rewrite"""
+        self.assertEqual(self.filter_between("alice,bob"), {self.direct, self.group})
+
+    def test_between_users_returns_each_conversation_once(self):
+        filterset = ConversationParticipantFilter(
+            {'between_users': "alice,bob,carol"}, queryset=Conversation.objects.all()
+        )
+        self.assertEqual(list(filterset.qs), [self.group])
+
+    def test_between_users_with_unknown_username_matches_nothing(self):
+        self.assertEqual(self.filter_between("alice,nobody"), set())
+
+
+class ConversationLastMessageTest(TestCase):
+    def setUp(self):
+        self.alice = make_user("alice")
+        self.conversation = Conversation.objects.create()
+        self.conversation.participants.add(self.alice)
+        self.now = timezone.now()
+
+    def send(self, body, minutes_ago=0):
+        return Message.objects.create(
+            sender=self.alice,
+            conversation=self.conversation,
+            message_body=body,
+            sent_at=self.now - timedelta(minutes=minutes_ago),
+        )
+
+    def last_message_id(self):
+        return Conversation.objects.values_list('last_message', flat=True).get(
+            pk=self.conversation.pk
+        )
+
+    def test_new_message_becomes_last_message(self):
+        self.send("first", minutes_ago=2)
+        newest = self.send("second", minutes_ago=1)
+        self.assertEqual(self.last_message_id(), newest.pk)
+
+    def test_older_message_does_not_replace_last_message(self):
+        newest = self.send("newest", minutes_ago=1)
+        self.send("backfilled", minutes_ago=10)
+        self.assertEqual(self.last_message_id(), newest.pk)
+
+    def test_insert_updates_conversation_in_one_query(self):
+        message = Message(sender=self.alice, conversation=self.conversation, message_body="hi")
+        with CaptureQueriesContext(connection) as queries:
+            message.save()
+        updates = [q for q in queries if q['sql'].startswith('UPDATE')]
+        self.assertEqual(len(updates), 1)
+
+    def test_instance_delete_repoints_last_message(self):
+        older = self.send("older", minutes_ago=2)
+        newest = self.send("newest", minutes_ago=1)
+        newest.delete()
+        self.assertEqual(self.last_message_id(), older.pk)
+
+    def test_queryset_delete_repoints_last_message(self):
+        older = self.send("older", minutes_ago=2)
+        self.send("newest", minutes_ago=1)
+        Message.objects.filter(message_body="newest").delete()
+        self.assertEqual(self.last_message_id(), older.pk)
+
+    def test_deleting_every_message_clears_last_message(self):
+        self.send("only")
+        Message.objects.filter(conversation=self.conversation).delete()
+        self.assertIsNone(self.last_message_id())
 
-# Create your tests here.
+    def test_list_serializer_renders_last_message(self):
+        self.send("older", minutes_ago=2)
+        self.send("x" * 150, minutes_ago=1)
+        conversation = ConversationListSerializer.setup_eager_loading(
+            Conversation.objects.filter(pk=self.conversation.pk)
+        ).get()
+        latest = ConversationListSerializer().get_latest_message(conversation)
+        self.assertEqual(latest['sender'], {'username': "alice", 'full_name': "Alice Test"})
+        self.assertEqual(latest['message_body'], "x" * 100 + "...")
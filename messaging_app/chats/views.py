@@ -4,7 +4,7 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db.models import Q, Count, Prefetch
+from django.db.models import Q, Count
 from django.utils import timezone
 from datetime import timedelta
 
@@ -177,19 +177,13 @@ class ConversationViewSet(viewsets.ModelViewSet):
         """
         Return conversations where the current user is a participant with optimized queries
         """
-        return Conversation.objects.filter(
+        queryset = Conversation.objects.filter(
             participants=self.request.user
-        ).select_related().prefetch_related(
-            'participants',
-            Prefetch(
-                'messages',
-                queryset=Message.objects.select_related('sender').order_by('-sent_at')[:5],
-                to_attr='recent_messages'
-            )
         ).annotate(
             participant_count=Count('participants'),
             message_count=Count('messages')
         )
+        return self.get_serializer_class().setup_eager_loading(queryset)
            
     def get_serializer_class(self):
         """
@@ -385,11 +379,9 @@ class MessageViewSet(viewsets.ModelViewSet):
             participants=self.request.user
         )
         
-        queryset = Message.objects.filter(
-            conversation__in=user_conversations
-        ).select_related('sender', 'conversation').prefetch_related(
-            'conversation__participants'
-        )
+        queryset = MessageSerializer.setup_eager_loading(
+            Message.objects.filter(conversation__in=user_conversations)
+        ).prefetch_related('conversation__participants')
         
         # Handle nested routing - filter by conversation if it's in the URL path
         if 'conversation_pk' in self.kwargs:
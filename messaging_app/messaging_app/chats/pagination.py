@@ -0,0 +1,15 @@
+# chats/pagination.py
+
+from rest_framework.pagination import CursorPagination
+
+
+class MessageCursorPagination(CursorPagination):
+    """
+    Cursor pagination for conversation history, newest first.
+    Each page is a range scan from the cursor's sent_at instead of an
+    OFFSET that grows with how far back the client has scrolled.
+    """
+    ordering = '-sent_at'
+    page_size = 50
+    page_size_query_param = 'limit'
+    max_page_size = 100
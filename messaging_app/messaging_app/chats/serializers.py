@@ -1,12 +1,81 @@
 # chats/serializers.py
 
+from collections import defaultdict
+from functools import lru_cache
+from itertools import chain
+
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
+from django.db.models import Count, F, Prefetch, Q
 from django.utils import timezone
+from django.utils.functional import cached_property
 from .models import User, Conversation, ConversationParticipant, Message, MessageReaction
+from .utils import model_field_names
 
 User = get_user_model()
 
+# Users last seen within this window are reported as "recently_active"
+RECENTLY_ACTIVE_WINDOW = timezone.timedelta(minutes=5)
+
+
+@lru_cache(maxsize=1)
+def _reaction_map():
+    """
+    Return the reaction_type -> emoji lookup, built once on first use
+    instead of per rendered reaction
+    """
+    return dict(MessageReaction.REACTION_TYPES)
+
+
+class EagerLoadingSerializerMixin:
+    """
+    Mixin letting views load exactly the relations a serializer reads.
+    Serializers list them in Meta.select_related / Meta.prefetch_related
+    and views call Serializer.setup_eager_loading(queryset).
+    """
+    @classmethod
+    def setup_eager_loading(cls, queryset):
+        select_related = getattr(cls.Meta, 'select_related', ())
+        prefetch_related = getattr(cls.Meta, 'prefetch_related', ())
+        if select_related:
+            queryset = queryset.select_related(*select_related)
+        if prefetch_related:
+            queryset = queryset.prefetch_related(*prefetch_related)
+        return queryset
+
+
+def _minimal_user_dict(user, cache=None):
+    """
+    Build the UserMinimalSerializer payload for a nested user directly,
+    skipping serializer instantiation for these fixed-shape dicts.
+    When a cache dict is given, each user is built once and reused.
+    """
+    if cache is not None:
+        cached = cache.get(user.pk)
+        if cached is not None:
+            return cached
+    
+    data = {
+        'user_id': user.user_id,
+        'username': user.username,
+        'first_name': user.first_name,
+        'last_name': user.last_name,
+        'full_name': user.full_name or user.username,
+        'profile_picture': user.profile_picture.url if user.profile_picture else None,
+        'is_online': user.is_online
+    }
+    if cache is not None:
+        cache[user.pk] = data
+    return data
+
+
+def _user_cache(context):
+    """
+    Return the nested-user cache shared by every serializer rendering
+    with this context (list children and nested serializers included)
+    """
+    return context.setdefault('_user_cache', {})
+
 
 class UserSerializer(serializers.ModelSerializer):
     """
@@ -24,6 +93,17 @@ class UserSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['user_id', 'created_at', 'last_seen']
     
+    @cached_property
+    def _online_threshold(self):
+        """
+        Cut-off for "recently_active", taken from the view context when
+        provided and otherwise computed once per serializer
+        """
+        threshold = self.context.get('online_threshold')
+        if threshold is None:
+            threshold = timezone.now() - RECENTLY_ACTIVE_WINDOW
+        return threshold
+    
     def to_representation(self, instance):
         """
         Override to populate computed fields using SerializerMethodField logic
@@ -31,16 +111,14 @@ class UserSerializer(serializers.ModelSerializer):
         data = super().to_representation(instance)
         
         # Populate full_name
-        full_name = instance.get_full_name()
-        data['full_name'] = full_name if full_name.strip() else instance.username
+        data['full_name'] = instance.full_name or instance.username
         
         # Populate is_online_status
         if instance.is_online:
             data['is_online_status'] = "online"
         else:
             # Consider user online if last seen within 5 minutes
-            time_threshold = timezone.now() - timezone.timedelta(minutes=5)
-            if instance.last_seen and instance.last_seen > time_threshold:
+            if instance.last_seen and instance.last_seen > self._online_threshold:
                 data['is_online_status'] = "recently_active"
             else:
                 data['is_online_status'] = "offline"
@@ -61,7 +139,7 @@ class UserMinimalSerializer(serializers.ModelSerializer):
     """
     Minimal User serializer for nested relationships (reduces payload size)
     """
-    full_name = serializers.SerializerMethodField()
+    full_name = serializers.CharField(read_only=True)
     
     class Meta:
         model = User
@@ -75,8 +153,7 @@ class UserMinimalSerializer(serializers.ModelSerializer):
         data = super().to_representation(instance)
         
         # Populate full_name
-        full_name = instance.get_field_names()
-        data['full_name'] = full_name if full_name.strip() else instance.username
+        data['full_name'] = instance.full_name or instance.username
         
         return data
 
@@ -100,19 +177,17 @@ class MessageReactionSerializer(serializers.ModelSerializer):
         data = super().to_representation(instance)
         
         # Populate reaction_emoji
-        data['reaction_emoji'] = dict(MessageReaction.REACTION_TYPES).get(instance.reaction_type, '')
+        data['reaction_emoji'] = _reaction_map().get(instance.reaction_type, '')
         
         return data
 
 
-class MessageSerializer(serializers.ModelSerializer):
+class MessageSerializer(EagerLoadingSerializerMixin, serializers.ModelSerializer):
     """
     Main Message serializer with nested relationships
     """
     sender = UserMinimalSerializer(read_only=True)
-    reply_to_message = serializers.DictField(read_only=True)
     reactions = MessageReactionSerializer(source='message_reactions', many=True, read_only=True)
-    reaction_summary = serializers.DictField(read_only=True)
     replies_count = serializers.IntegerField(read_only=True)
     file_url = serializers.CharField(read_only=True, allow_null=True)
     is_own_message = serializers.BooleanField(read_only=True)
@@ -121,18 +196,39 @@ class MessageSerializer(serializers.ModelSerializer):
         model = Message
         fields = [
             'message_id', 'sender', 'message_type', 'message_body', 
-            'file_attachment', 'file_url', 'reply_to', 'reply_to_message',
+            'file_attachment', 'file_url', 'reply_to',
             'is_edited', 'edited_at', 'is_deleted', 'sent_at', 'updated_at',
-            'reactions', 'reaction_summary', 'replies_count', 'is_own_message'
+            'reactions', 'replies_count', 'is_own_message'
         ]
         read_only_fields = [
             'message_id', 'sent_at', 'updated_at', 'is_edited', 
             'edited_at', 'is_deleted'
         ]
+        select_related = ('sender', 'reply_to__sender', 'conversation')
+        # Reactions load only the columns MessageReactionSerializer renders
+        prefetch_related = (
+            Prefetch(
+                'message_reactions',
+                queryset=MessageReaction.objects.select_related('user').only(
+                    'id', 'message', 'user', 'reaction_type', 'created_at'
+                )
+            ),
+        )
+    
+    @classmethod
+    def setup_eager_loading(cls, queryset):
+        """
+        Load the relations and counts used by to_representation in bulk
+        """
+        return super().setup_eager_loading(queryset).annotate(
+            replies_count_db=Count('replies', filter=Q(replies__is_deleted=False))
+        )
     
     def to_representation(self, instance):
         """
-        Override to populate all computed fields for messages
+        Override to populate all computed fields for messages.
+        reply_to_message and reaction_summary are not declared fields;
+        they are added here so DRF does not bind and skip them per row.
         """
         data = super().to_representation(instance)
         request = self.context.get('request')
@@ -141,7 +237,7 @@ class MessageSerializer(serializers.ModelSerializer):
         if instance.reply_to and not instance.reply_to.is_deleted:
             data['reply_to_message'] = {
                 'message_id': instance.reply_to.message_id,
-                'sender': UserMinimalSerializer(instance.reply_to.sender).data,
+                'sender': _minimal_user_dict(instance.reply_to.sender, _user_cache(self.context)),
                 'message_type': instance.reply_to.message_type,
                 'message_body': instance.reply_to.message_body[:100] + "..." if len(instance.reply_to.message_body) > 100 else instance.reply_to.message_body,
                 'sent_at': instance.reply_to.sent_at
@@ -149,23 +245,24 @@ class MessageSerializer(serializers.ModelSerializer):
         else:
             data['reply_to_message'] = None
         
-        # Populate reaction_summary
-        reactions = instance.message_reactions.all()
-        summary = {}
-        for reaction in reactions:
-            reaction_type = reaction.reaction_type
-            if reaction_type not in summary:
-                summary[reaction_type] = {
-                    'count': 0,
-                    'emoji': dict(MessageReaction.REACTION_TYPES).get(reaction_type, ''),
-                    'users': []
-                }
-            summary[reaction_type]['count'] += 1
-            summary[reaction_type]['users'].append(reaction.user.username)
-        data['reaction_summary'] = summary
-        
-        # Populate replies_count
-        data['replies_count'] = instance.replies.filter(is_deleted=False).count()
+        # Populate reaction_summary (group usernames in one pass, then summarise)
+        users_by_type = defaultdict(list)
+        for reaction in instance.message_reactions.all():
+            users_by_type[reaction.reaction_type].append(reaction.user.username)
+        data['reaction_summary'] = {
+            reaction_type: {
+                'count': len(users),
+                'emoji': _reaction_map().get(reaction_type, ''),
+                'users': users
+            }
+            for reaction_type, users in users_by_type.items()
+        }
+        
+        # Populate replies_count (annotated by setup_eager_loading when available)
+        replies_count = getattr(instance, 'replies_count_db', None)
+        if replies_count is None:
+            replies_count = instance.replies.filter(is_deleted=False).count()
+        data['replies_count'] = replies_count
         
         # Populate file_url
         if instance.file_attachment:
@@ -233,16 +330,19 @@ class ConversationParticipantSerializer(serializers.ModelSerializer):
         """
         data = super().to_representation(instance)
         
-        # Populate unread_count
-        data['unread_count'] = instance.conversation.messages.filter(
-            sent_at__gt=instance.last_read_at,
-            is_deleted=False
-        ).exclude(sender=instance.user).count()
+        # Populate unread_count (annotated by the viewset prefetch when available)
+        unread_count = getattr(instance, 'unread_count_db', None)
+        if unread_count is None:
+            unread_count = instance.conversation.messages.filter(
+                sent_at__gt=instance.last_read_at,
+                is_deleted=False
+            ).exclude(sender=instance.user).count()
+        data['unread_count'] = unread_count
         
         return data
 
 
-class ConversationSerializer(serializers.ModelSerializer):
+class ConversationSerializer(EagerLoadingSerializerMixin, serializers.ModelSerializer):
     """
     Main Conversation serializer with nested relationships
     """
@@ -267,6 +367,32 @@ class ConversationSerializer(serializers.ModelSerializer):
             'display_name', 'display_image'
         ]
         read_only_fields = ['conversation_id', 'created_at', 'updated_at']
+        select_related = ('created_by',)
+        prefetch_related = (
+            # Participants and their users load only the columns that are rendered
+            Prefetch(
+                'conversation_participants',
+                queryset=ConversationParticipant.objects.select_related('user').only(
+                    'conversation', 'user',
+                    *model_field_names(ConversationParticipant, ConversationParticipantSerializer.Meta.fields),
+                    *model_field_names(User, UserMinimalSerializer.Meta.fields, prefix='user__')
+                ).annotate(
+                    unread_count_db=Count(
+                        'conversation__messages',
+                        filter=Q(
+                            conversation__messages__sent_at__gt=F('last_read_at'),
+                            conversation__messages__is_deleted=False
+                        ) & ~Q(conversation__messages__sender=F('user'))
+                    )
+                )
+            ),
+            # One windowed query for the newest message of each conversation
+            Prefetch(
+                'messages',
+                queryset=Message.objects.select_related('sender').order_by('-sent_at')[:1],
+                to_attr='last_message_cached'
+            ),
+        )
     
     def to_representation(self, instance):
         """
@@ -275,12 +401,16 @@ class ConversationSerializer(serializers.ModelSerializer):
         data = super().to_representation(instance)
         request = self.context.get('request')
         
-        # Populate last_message
-        last_message = instance.get_last_message()
+        # Populate last_message (prefetched by setup_eager_loading when available)
+        last_message_cached = getattr(instance, 'last_message_cached', None)
+        if last_message_cached is None:
+            last_message = instance.get_last_message()
+        else:
+            last_message = last_message_cached[0] if last_message_cached else None
         if last_message:
             data['last_message'] = {
                 'message_id': last_message.message_id,
-                'sender': UserMinimalSerializer(last_message.sender).data,
+                'sender': _minimal_user_dict(last_message.sender, _user_cache(self.context)),
                 'message_type': last_message.message_type,
                 'message_body': last_message.message_body[:100] + "..." if len(last_message.message_body) > 100 else last_message.message_body,
                 'sent_at': last_message.sent_at,
@@ -295,33 +425,42 @@ class ConversationSerializer(serializers.ModelSerializer):
         else:
             data['unread_count'] = 0
         
-        # Populate participant_count
-        data['participant_count'] = instance.conversation_participants.filter(is_active=True).count()
+        # Populate participant_count (annotated by the viewset when available)
+        participant_count = getattr(instance, 'participant_count', None)
+        if participant_count is None:
+            participant_count = instance.conversation_participants.filter(is_active=True).count()
+        data['participant_count'] = participant_count
+        
+        # Resolve the other participant of a direct conversation once
+        other_participant = None
+        if request and request.user.is_authenticated and instance.conversation_type == 'direct':
+            other_participant = self.get_other_participant(instance, request.user)
         
         # Populate display_name
         if instance.conversation_type == 'group' and instance.title:
             data['display_name'] = instance.title
-        elif request and request.user.is_authenticated and instance.conversation_type == 'direct':
-            other_participant = instance.participants.exclude(user_id=request.user.user_id).first()
-            if other_participant:
-                full_name = other_participant.get_full_name()
-                data['display_name'] = full_name if full_name.strip() else other_participant.username
-            else:
-                data['display_name'] = f"Conversation {str(instance.conversation_id)[:8]}"
+        elif other_participant:
+            data['display_name'] = other_participant.full_name or other_participant.username
         else:
             data['display_name'] = f"Conversation {str(instance.conversation_id)[:8]}"
         
         # Populate display_image
-        if request and request.user.is_authenticated and instance.conversation_type == 'direct':
-            other_participant = instance.participants.exclude(user_id=request.user.user_id).first()
-            if other_participant and other_participant.profile_picture:
-                data['display_image'] = request.build_absolute_uri(other_participant.profile_picture.url)
-            else:
-                data['display_image'] = None
+        if other_participant and other_participant.profile_picture:
+            data['display_image'] = request.build_absolute_uri(other_participant.profile_picture.url)
         else:
             data['display_image'] = None
         
         return data
+    
+    def get_other_participant(self, instance, user):
+        """
+        Return the first participant other than user, read from the
+        prefetched conversation_participants instead of a new query
+        """
+        for participant in instance.conversation_participants.all():
+            if participant.user_id != user.user_id:
+                return participant.user
+        return None
 
 
 class ConversationDetailSerializer(ConversationSerializer):
@@ -332,6 +471,16 @@ class ConversationDetailSerializer(ConversationSerializer):
     
     class Meta(ConversationSerializer.Meta):
         fields = ConversationSerializer.Meta.fields + ['recent_messages']
+        # One windowed query for the 20 latest messages of each conversation
+        prefetch_related = ConversationSerializer.Meta.prefetch_related + (
+            Prefetch(
+                'messages',
+                queryset=MessageSerializer.setup_eager_loading(
+                    Message.objects.filter(is_deleted=False)
+                ).order_by('-sent_at')[:20],
+                to_attr='recent_messages_cached'
+            ),
+        )
     
     def to_representation(self, instance):
         """
@@ -339,8 +488,12 @@ class ConversationDetailSerializer(ConversationSerializer):
         """
         data = super().to_representation(instance)
         
-        # Populate recent_messages
-        recent_messages = instance.messages.filter(is_deleted=False)[:20]
+        # Populate recent_messages (prefetched by setup_eager_loading when available)
+        recent_messages = getattr(instance, 'recent_messages_cached', None)
+        if recent_messages is None:
+            recent_messages = MessageSerializer.setup_eager_loading(
+                instance.messages.filter(is_deleted=False)
+            ).order_by('-sent_at')[:20]
         data['recent_messages'] = MessageSerializer(
             recent_messages, 
             many=True, 
@@ -379,12 +532,13 @@ class ConversationCreateSerializer(serializers.ModelSerializer):
                 "Group conversations must have at least one other participant."
             )
         
-        # Validate that all participant IDs exist
-        existing_users = User.objects.filter(user_id__in=participant_ids)
+        # Validate that all participant IDs exist, keeping the users for create()
+        existing_users = User.objects.in_bulk(participant_ids)
         if len(existing_users) != len(participant_ids):
             raise serializers.ValidationError(
                 "One or more participant IDs are invalid."
             )
+        self.context['_validated_users'] = existing_users
         
         return data
     
@@ -399,21 +553,22 @@ class ConversationCreateSerializer(serializers.ModelSerializer):
             **validated_data
         )
         
-        # Add the creator as a participant
-        ConversationParticipant.objects.create(
+        # Reuse the users loaded by validate() instead of querying them again
+        users = self.context.get('_validated_users')
+        if users is None:
+            users = User.objects.in_bulk(participant_ids)
+        
+        # Add the creator and the other participants in a single INSERT
+        creator = ConversationParticipant(
             conversation=conversation,
             user=request.user,
             role='owner' if validated_data.get('conversation_type') == 'group' else 'member'
         )
-        
-        # Add other participants
-        for user_id in participant_ids:
-            user = User.objects.get(user_id=user_id)
-            ConversationParticipant.objects.create(
-                conversation=conversation,
-                user=user,
-                role='member'
-            )
+        members = (
+            ConversationParticipant(conversation=conversation, user=users[user_id], role='member')
+            for user_id in participant_ids
+        )
+        ConversationParticipant.objects.bulk_create(chain([creator], members))
         
         return conversation
 
@@ -0,0 +1,61 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from chats.models import User, Conversation, Message
+from .pagination import MessageCursorPagination
+
+
+class MessageCursorPaginationTest(TestCase):
+    def setUp(self):
+        self.alice = User.objects.create_user(
+            username="alice", email="alice@example.com", password="pass123"
+        )
+        self.conversation = Conversation.objects.create()
+        now = timezone.now()
+        self.messages = [
+            Message.objects.create(
+                sender=self.alice,
+                conversation=self.conversation,
+                message_body=f"message {i}",
+                sent_at=now - timedelta(minutes=i),
+            )
+            for i in range(5)
+        ]
+        self.factory = APIRequestFactory()
+
+    def paginate(self, url):
+        paginator = MessageCursorPagination()
+        request = Request(self.factory.get(url))
+        page = paginator.paginate_queryset(Message.objects.all(), request)
+        return paginator, page
+
+    def test_pages_newest_first_and_follows_next_cursor(self):
+        paginator, first = self.paginate('/messages/?limit=2')
+        self.assertEqual(first, self.messages[:2])
+        self.assertIsNone(paginator.get_previous_link())
+
+        _, second = self.paginate(paginator.get_next_link())
+        self.assertEqual(second, self.messages[2:4])
+
+    def test_response_has_cursor_links_instead_of_page_numbers(self):
+        paginator, page = self.paginate('/messages/?limit=2')
+        response = paginator.get_paginated_response([m.message_body for m in page])
+        self.assertEqual(set(response.data), {'next', 'previous', 'results'})
+        self.assertIn('cursor=', response.data['next'])
+
+    def test_limit_is_capped_at_max_page_size(self):
+        paginator, _ = self.paginate('/messages/?limit=1000')
+        self.assertEqual(paginator.page_size, MessageCursorPagination.max_page_size)
+
+    def test_new_messages_do_not_shift_the_next_page(self):
+        paginator, _ = self.paginate('/messages/?limit=2')
+        next_link = paginator.get_next_link()
+        Message.objects.create(
+            sender=self.alice, conversation=self.conversation, message_body="newer"
+        )
+        _, second = self.paginate(next_link)
+        self.assertEqual(second, self.messages[2:4])
@@ -1,17 +1,18 @@
 # chats/urls.py
 
 from django.urls import path, include
-from rest_framework.routers import DefaultRouter
-from rest_framework_nested.routers import NestedDefaultRouter
+from rest_framework.routers import SimpleRouter
+from rest_framework_nested.routers import NestedSimpleRouter
 
 from .views import ConversationViewSet, MessageViewSet, UserRegistrationView, UserProfileView, UserListView, UserDetailView # Import your user-related views
 
 
-router = DefaultRouter()
+# SimpleRouter: no API root view or format-suffix patterns to match against
+router = SimpleRouter(trailing_slash=True)
 router.register(r'conversations', ConversationViewSet, basename='conversation')
 router.register(r'messages', MessageViewSet, basename='messages')
 
-conversations_router = NestedDefaultRouter(router, r'conversations', lookup='conversation')
+conversations_router = NestedSimpleRouter(router, r'conversations', lookup='conversation')
 conversations_router.register(r'messages', MessageViewSet, basename='conversation-messages')
 
 
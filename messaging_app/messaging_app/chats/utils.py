@@ -0,0 +1,11 @@
+# chats/utils.py
+
+
+def model_field_names(model, fields, prefix=''):
+    """
+    Return the entries of a serializer's Meta.fields that are concrete
+    columns of model, for use with QuerySet.only(); prefix names a
+    related model's columns (e.g. 'user__')
+    """
+    columns = {field.name for field in model._meta.concrete_fields}
+    return [prefix + name for name in fields if name in columns]
@@ -5,10 +5,14 @@ from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django_filters.rest_framework import DjangoFilterBackend
 from django.shortcuts import get_object_or_404
-from django.db.models import Q, Prefetch
+from django.db import transaction
+from django.db.models import Count, Exists, OuterRef, Q
+from django.utils import timezone
+from django.utils.cache import patch_cache_control
 
 from chats.permissions import IsParticipant
 from .models import Conversation, Message, ConversationParticipant, MessageReaction
+from .pagination import MessageCursorPagination
 from .serializers import (
     ConversationSerializer, 
     ConversationDetailSerializer,
@@ -20,7 +24,9 @@ from .serializers import (
     UserSerializer,
     UserProfileSerializer,
     UserMinimalSerializer, 
+    RECENTLY_ACTIVE_WINDOW,
 )
+from .utils import model_field_names
 
 # JWT customization and User Views
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
@@ -90,17 +96,46 @@ class UserProfileView(generics.RetrieveUpdateAPIView):
 
 
 class UserListView(viewsets.ReadOnlyModelViewSet): 
-    queryset = User.objects.all()
     serializer_class = UserSerializer
     permission_classes = (permissions.IsAuthenticated,)
     lookup_field = 'user_id' 
 
+    def get_queryset(self):
+        # Load only the columns UserSerializer renders
+        return User.objects.only(*model_field_names(User, UserSerializer.Meta.fields))
+
+    def get_serializer_context(self):
+        # Share one "recently active" cut-off across every user in the response
+        context = super().get_serializer_context()
+        context['online_threshold'] = timezone.now() - RECENTLY_ACTIVE_WINDOW
+        return context
+
 class UserDetailView(generics.RetrieveAPIView): 
-    queryset = User.objects.all()
     serializer_class = UserSerializer
     lookup_field = 'user_id' 
     permission_classes = (permissions.IsAuthenticated,)
 
+    def get_queryset(self):
+        return User.objects.only(*model_field_names(User, UserSerializer.Meta.fields))
+
+
+# Reads within this window of the stored last_read_at skip the write
+MARK_AS_READ_DEBOUNCE = timezone.timedelta(seconds=5)
+
+
+def _mark_as_read(request, conversation):
+    """
+    Advance request.user's last_read_at for conversation in a single
+    filtered UPDATE, skipped when it was already set moments ago
+    """
+    now = timezone.now()
+    ConversationParticipant.objects.filter(
+        Q(last_read_at__isnull=True) | Q(last_read_at__lt=now - MARK_AS_READ_DEBOUNCE),
+        conversation=conversation,
+        user=request.user
+    ).update(last_read_at=now)
+
+
 class ConversationViewSet(viewsets.ModelViewSet):
     """
     ViewSet for managing conversations
@@ -111,27 +146,51 @@ class ConversationViewSet(viewsets.ModelViewSet):
     filterset_fields = ['conversation_type', 'is_active']
     search_fields = ['conversation_participants__user__username'] 
     ordering_fields = ['updated_at', 'created_at']
+    # Serializer per action; anything not listed uses ConversationSerializer
+    _SERIALIZER_MAP = {
+        'create': ConversationCreateSerializer,
+        'retrieve': ConversationDetailSerializer,
+    }
     
     def get_serializer_class(self):
-        if self.action == 'create':
-            return ConversationCreateSerializer
-        elif self.action == 'retrieve':
-            return ConversationDetailSerializer
-        return ConversationSerializer
+        return self._SERIALIZER_MAP.get(self.action, ConversationSerializer)
     
     def get_queryset(self):
         """
         Filter conversations to show only those the user participates in
         with optimized prefetching for performance
         """
-        return Conversation.objects.filter(
-            conversation_participants__user=self.request.user,
-            conversation_participants__is_active=True,
+        # Membership is checked with EXISTS, so rows are not multiplied by
+        # participants and no DISTINCT is needed
+        is_participant = ConversationParticipant.objects.filter(
+            conversation=OuterRef('pk'),
+            user=self.request.user,
+            is_active=True
+        )
+        queryset = Conversation.objects.filter(
+            Exists(is_participant),
             is_active=True
-        ).select_related('created_by').prefetch_related(
-            'conversation_participants__user',
-            'messages'
-        ).distinct().order_by('-updated_at')
+        ).annotate(
+            participant_count=Count(
+                'conversation_participants',
+                filter=Q(conversation_participants__is_active=True)
+            )
+        )
+        
+        if self.action == 'retrieve':
+            queryset = ConversationDetailSerializer.setup_eager_loading(queryset)
+        else:
+            queryset = ConversationSerializer.setup_eager_loading(queryset)
+        
+        return queryset.order_by('-updated_at')
+    
+    def list(self, request, *args, **kwargs):
+        """
+        List conversations; clients may reuse the response for a few seconds
+        """
+        response = super().list(request, *args, **kwargs)
+        patch_cache_control(response, private=True, max_age=5)
+        return response
     
     def create(self, request, *args, **kwargs):
         """Create a new conversation with proper context"""
@@ -142,12 +201,18 @@ class ConversationViewSet(viewsets.ModelViewSet):
         if serializer.validated_data.get('conversation_type') == 'direct':
             participant_ids = serializer.validated_data.get('participant_ids', [])
             if participant_ids:
+                # One EXISTS per member instead of joining participants twice
                 existing_conversation = Conversation.objects.filter(
+                    Exists(ConversationParticipant.objects.filter(
+                        conversation=OuterRef('pk'),
+                        user=request.user
+                    )),
+                    Exists(ConversationParticipant.objects.filter(
+                        conversation=OuterRef('pk'),
+                        user__user_id=participant_ids[0]
+                    )),
                     conversation_type='direct',
-                    conversation_participants__user=request.user,
                     is_active=True
-                ).filter(
-                    conversation_participants__user__user_id=participant_ids[0]
                 ).first()
                 
                 if existing_conversation:
@@ -169,35 +234,26 @@ class ConversationViewSet(viewsets.ModelViewSet):
         Get paginated messages for a specific conversation
         """
         conversation = self.get_object()
-        self.check_object_permissions(request, conversation)
 
         
         # Mark messages as read
-        participant = ConversationParticipant.objects.filter(
-            conversation=conversation,
-            user=request.user
-        ).first()
-        
-        if participant:
-            participant.mark_as_read()
+        _mark_as_read(request, conversation)
         
-        # Get messages with pagination support
-        page = request.query_params.get('page', 1)
-        limit = min(int(request.query_params.get('limit', 50)), 100) 
-        offset = (int(page) - 1) * limit
-        
-        messages = conversation.messages.filter(
-            is_deleted=False
-        ).select_related('sender', 'reply_to__sender').prefetch_related(
-            'message_reactions__user'
-        ).order_by('-sent_at')[offset:offset + limit]
+        # Get messages with cursor pagination (newest first)
+        messages = MessageSerializer.setup_eager_loading(
+            conversation.messages.filter(is_deleted=False)
+        )
+        paginator = MessageCursorPagination()
+        page = paginator.paginate_queryset(messages, request, view=self)
         
         serializer = MessageSerializer(
-            messages, 
+            page, 
             many=True, 
             context={'request': request}
         )
-        return Response(serializer.data)
+        response = paginator.get_paginated_response(serializer.data)
+        patch_cache_control(response, private=True, max_age=5)
+        return response
     
     @action(detail=True, methods=['post'])
     def send_message(self, request, pk=None):
@@ -205,7 +261,6 @@ class ConversationViewSet(viewsets.ModelViewSet):
         Send a message to a specific conversation
         """
         conversation = self.get_object()
-        self.check_object_permissions(request, conversation)
 
         # Check if user is an active participant
         # participant = ConversationParticipant.objects.filter(
@@ -228,7 +283,7 @@ class ConversationViewSet(viewsets.ModelViewSet):
             )
             
             # Update conversation's updated_at timestamp
-            conversation.save(update_fields=['updated_at'])
+            Conversation.objects.filter(pk=conversation.pk).update(updated_at=timezone.now())
             
             # Return the created message with full details
             message_serializer = MessageSerializer(message, context={'request': request})
@@ -301,15 +356,13 @@ class ConversationViewSet(viewsets.ModelViewSet):
     def add_participant(self, request, pk=None):
         conversation = self.get_object()
 
-        self.check_object_permissions(request, conversation)
-
-        participant = ConversationParticipant.objects.filter(
+        is_admin = ConversationParticipant.objects.filter(
             conversation=conversation,
             user=request.user,
             role__in=['owner', 'admin']
-        ).first()
+        ).exists()
 
-        if not participant:
+        if not is_admin:
             return Response(
                 {'error': 'You do not have permission to add participants'}, 
                 status=status.HTTP_403_FORBIDDEN
@@ -320,8 +373,6 @@ class ConversationViewSet(viewsets.ModelViewSet):
             return Response({'error': 'user_id is required'}, status=status.HTTP_400_BAD_REQUEST)
 
         try:
-            from django.contrib.auth import get_user_model
-            User = get_user_model()
             user = User.objects.get(user_id=user_id)
 
             if ConversationParticipant.objects.filter(conversation=conversation, user=user).exists():
@@ -339,25 +390,19 @@ class ConversationViewSet(viewsets.ModelViewSet):
         except User.DoesNotExist:
             return Response({'error': 'User not found'}, status=status.HTTP_404_NOT_FOUND)
 
-
-        @action(detail=True, methods=['post'])
-        def leave(self, request, pk=None):
-            """
-            Leave a conversation (mark participant as inactive)
-            """
-            conversation = self.get_object()
-            self.check_object_permissions(request, conversation)
-
-            
-            participant = ConversationParticipant.objects.filter(
-                conversation=conversation,
-                user=request.user,
-            )
-            
-            participant.is_active = False
-            participant.save()
-            
-            return Response({'message': 'Successfully left the conversation'})
+    @action(detail=True, methods=['post'])
+    def leave(self, request, pk=None):
+        """
+        Leave a conversation (mark participant as inactive)
+        """
+        conversation = self.get_object()
+        
+        ConversationParticipant.objects.filter(
+            conversation=conversation,
+            user=request.user
+        ).update(is_active=False)
+        
+        return Response({'message': 'Successfully left the conversation'})
 
 
 class MessageViewSet(viewsets.ModelViewSet):
@@ -370,23 +415,25 @@ class MessageViewSet(viewsets.ModelViewSet):
     filterset_fields = ['conversation', 'is_deleted']
     search_fields = ['message_body']
     ordering_fields = ['sent_at', 'updated_at']
+    # Serializer per action; anything not listed uses MessageSerializer
+    _SERIALIZER_MAP = {
+        'create': MessageCreateSerializer,
+    }
     
     def get_serializer_class(self):
-        if self.action == 'create':
-            return MessageCreateSerializer
-        return MessageSerializer
+        return self._SERIALIZER_MAP.get(self.action, MessageSerializer)
     
     def get_queryset(self):
         """
         Filter messages to show only those in conversations the user participates in
         """
-        return Message.objects.filter(
-            conversation__conversation_participants__user=self.request.user,
-            conversation__conversation_participants__is_active=True,
-            is_deleted=False
-        ).select_related('sender', 'conversation', 'reply_to__sender').prefetch_related(
-            'message_reactions__user'
-        ).distinct().order_by('-sent_at')
+        is_participant = ConversationParticipant.objects.filter(
+            conversation=OuterRef('conversation_id'),
+            user=self.request.user,
+            is_active=True
+        )
+        queryset = Message.objects.filter(Exists(is_participant), is_deleted=False)
+        return MessageSerializer.setup_eager_loading(queryset).order_by('-sent_at')
     
     def perform_create(self, serializer):
         """
@@ -394,13 +441,13 @@ class MessageViewSet(viewsets.ModelViewSet):
         """
         conversation = serializer.validated_data['conversation']
 
-        participant = ConversationParticipant.objects.filter(
+        is_active_participant = ConversationParticipant.objects.filter(
             conversation=conversation,
             user=self.request.user,
             is_active=True
-        ).first()
+        ).exists()
         
-        if not participant:
+        if not is_active_participant:
             from rest_framework import serializers as drf_serializers
             raise drf_serializers.ValidationError(
                 'You are not an active participant in this conversation'
@@ -409,7 +456,7 @@ class MessageViewSet(viewsets.ModelViewSet):
         message = serializer.save(sender=self.request.user)
         
         # Update conversation's updated_at timestamp
-        conversation.save(update_fields=['updated_at'])
+        Conversation.objects.filter(pk=conversation.pk).update(updated_at=timezone.now())
         
         return message
     
@@ -420,7 +467,6 @@ class MessageViewSet(viewsets.ModelViewSet):
         """
         
         message = self.get_object()
-        self.check_object_permissions(request, message)
         
         serializer = MessageReactionCreateSerializer(
             data=request.data,
@@ -428,24 +474,22 @@ class MessageViewSet(viewsets.ModelViewSet):
         )
         
         if serializer.is_valid():
-            # Check if reaction already exists
-            existing_reaction = MessageReaction.objects.filter(
-                message=message,
-                user=request.user,
-                reaction_type=serializer.validated_data['reaction_type']
-            ).first()
-            
-            if existing_reaction:
-                # Remove existing reaction (toggle off)
-                existing_reaction.delete()
-                return Response({'message': 'Reaction removed'})
-            else:
+            with transaction.atomic():
+                # Remove existing reaction (toggle off); deleting first avoids a lookup
+                deleted, _ = MessageReaction.objects.filter(
+                    message=message,
+                    user=request.user,
+                    reaction_type=serializer.validated_data['reaction_type']
+                ).delete()
+                if deleted:
+                    return Response({'message': 'Reaction removed'})
+                
                 # Add new reaction
                 reaction = serializer.save()
-                return Response(
-                    MessageReactionCreateSerializer(reaction).data,
-                    status=status.HTTP_201_CREATED
-                )
+            return Response(
+                MessageReactionCreateSerializer(reaction).data,
+                status=status.HTTP_201_CREATED
+            )
         
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
@@ -455,9 +499,9 @@ class MessageViewSet(viewsets.ModelViewSet):
         Edit a message (only by sender)
         """
         message = self.get_object()
-        self.check_object_permissions(request, message)
         
-        if message.sender != request.user:
+        # Authorization before validation; sender_id is already loaded
+        if message.sender_id != request.user.pk:
             return Response(
                 {'error': 'You can only edit your own messages'}, 
                 status=status.HTTP_403_FORBIDDEN
@@ -470,9 +514,18 @@ class MessageViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
+        # Single UPDATE of just the changed columns
+        now = timezone.now()
+        Message.objects.filter(pk=message.pk).update(
+            message_body=new_body,
+            is_edited=True,
+            edited_at=now,
+            updated_at=now
+        )
+        
         message.message_body = new_body
         message.is_edited = True
-        message.save(update_fields=['message_body', 'is_edited', 'edited_at', 'updated_at'])
+        message.edited_at = message.updated_at = now
         
         serializer = MessageSerializer(message, context={'request': request})
         return Response(serializer.data)
@@ -483,16 +536,18 @@ class MessageViewSet(viewsets.ModelViewSet):
         Soft delete a message (only by sender)
         """
         message = self.get_object()
-        self.check_object_permissions(request, message)
         
-        if message.sender != request.user:
+        if message.sender_id != request.user.pk:
             return Response(
                 {'error': 'You can only delete your own messages'}, 
                 status=status.HTTP_403_FORBIDDEN
             )
         
-        message.is_deleted = True
-        message.save(update_fields=['is_deleted', 'updated_at'])
+        # Single UPDATE of just the changed columns
+        Message.objects.filter(pk=message.pk).update(
+            is_deleted=True,
+            updated_at=timezone.now()
+        )
         
         return Response({'message': 'Message deleted successfully'})
     
@@ -519,13 +574,7 @@ class MessageViewSet(viewsets.ModelViewSet):
         
         self.check_object_permissions(request, conversation)
 
-        participant = ConversationParticipant.objects.filter(
-            conversation=conversation,
-            user=request.user
-        ).first()
-        
-        if participant:
-            participant.mark_as_read()
+        _mark_as_read(request, conversation)
         
         queryset = self.get_queryset().filter(conversation=conversation).order_by('-sent_at')
         page = self.paginate_queryset(queryset)
@@ -534,5 +583,7 @@ class MessageViewSet(viewsets.ModelViewSet):
             serializer = self.get_serializer(page, many=True)
             return self.get_paginated_response(serializer.data)
        
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        # Unpaginated: stream rows in chunks (prefetches run per chunk) to bound memory
+        serializer = self.get_serializer()
+        data = [serializer.to_representation(message) for message in queryset.iterator(chunk_size=500)]
+        return Response(data)
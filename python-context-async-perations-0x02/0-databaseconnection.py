@@ -5,11 +5,14 @@ Custom class-based context manager for Database connection
 
 import sqlite3
 
+from db_utils import get_connection
+
 
 class DatabaseConnection:
     """
     A custom context manager for handling database connections.
-    Automatically manages opening and closing database connections.
+    Reuses a per-thread cached connection and manages the transaction
+    and cursor for each block; the connection itself stays open.
     """
     
     def __init__(self, database_name):
@@ -25,13 +28,13 @@ class DatabaseConnection:
     
     def __enter__(self):
         """
-        Enter the context manager - establish database connection.
+        Enter the context manager - fetch the cached database connection.
         
         Returns:
             sqlite3.Cursor: The database cursor for executing queries
         """
         try:
-            self.connection = sqlite3.connect(self.database_name)
+            self.connection = get_connection(self.database_name)
             self.cursor = self.connection.cursor()
             return self.cursor
         except sqlite3.Error as e:
@@ -40,7 +43,8 @@ class DatabaseConnection:
     
     def __exit__(self, exc_type, exc_val, exc_tb):
         """
-        Exit the context manager - close database connection.
+        Exit the context manager - finish the transaction and close the cursor.
+        The connection is kept open for the next block on this thread.
         
         Args:
             exc_type: Exception type if an exception occurred
@@ -56,7 +60,6 @@ class DatabaseConnection:
             else:
                 # Exception occurred, rollback any pending transactions
                 self.connection.rollback()
-            self.connection.close()
         
         # Return False to propagate any exceptions
         return False
@@ -91,7 +94,7 @@ def main():
         ]
         
         cursor.executemany('''
-            INSERT OR REPLACE INTO users (id, name, age, email) 
+            INSERT OR IGNORE INTO users (id, name, age, email) 
             VALUES (?, ?, ?, ?)
         ''', sample_users)
         
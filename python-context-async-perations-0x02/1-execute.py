@@ -5,6 +5,42 @@ Reusable Query Context Manager
 
 import sqlite3
 
+from db_utils import get_connection
+
+
+def _is_select(query):
+    """Return True if query is a SELECT statement"""
+    return query.lstrip()[:6].upper() == 'SELECT'
+
+
+def run_query(database_name, query, parameters=()):
+    """
+    Execute a single query and return its results, without the context
+    manager protocol. Runs on a per-thread connection that stays open, so
+    repeated SQL strings reuse their already-prepared statements.
+    
+    Args:
+        database_name (str): The name/path of the database file
+        query (str): The SQL query to execute
+        parameters (tuple): Parameters for the SQL query (optional)
+    
+    Returns:
+        list | int: Fetched rows for SELECT queries, otherwise the row count
+    """
+    connection = get_connection(database_name)
+    try:
+        cursor = connection.execute(query, parameters)
+        if _is_select(query):
+            results = cursor.fetchall()
+        else:
+            results = cursor.rowcount
+            connection.commit()
+        cursor.close()
+        return results
+    except sqlite3.Error:
+        connection.rollback()
+        raise
+
 
 class ExecuteQuery:
     """
@@ -24,42 +60,34 @@ class ExecuteQuery:
         self.database_name = database_name
         self.query = query
         self.parameters = parameters or ()
+        # Decided once here rather than on every __enter__
+        self.is_select = _is_select(query)
         self.connection = None
         self.cursor = None
-        self.results = None
     
     def __enter__(self):
         """
-        Enter the context manager - establish connection and execute query.
+        Enter the context manager - take this thread's cached connection and
+        execute the query. A failed statement is rolled back here, since
+        __exit__ is not called when __enter__ raises.
         
         Returns:
             list: The results of the executed query
         """
+        self.connection = get_connection(self.database_name)
         try:
-            self.connection = sqlite3.connect(self.database_name)
-            self.cursor = self.connection.cursor()
-            
-            # Execute the query with parameters
-            if self.parameters:
-                self.cursor.execute(self.query, self.parameters)
-            else:
-                self.cursor.execute(self.query)
-            
-            # Fetch results for SELECT queries
-            if self.query.strip().upper().startswith('SELECT'):
-                self.results = self.cursor.fetchall()
-            else:
-                self.results = self.cursor.rowcount
-            
-            return self.results
-        
-        except sqlite3.Error as e:
-            print(f"Database error: {e}")
+            self.cursor = self.connection.execute(self.query, self.parameters)
+        except sqlite3.Error:
+            self.connection.rollback()
             raise
+        
+        # Fetch results for SELECT queries
+        return self.cursor.fetchall() if self.is_select else self.cursor.rowcount
     
     def __exit__(self, exc_type, exc_val, exc_tb):
         """
-        Exit the context manager - close database connection.
+        Exit the context manager - commit or roll back and close the cursor;
+        the connection stays open for reuse.
         
         Args:
             exc_type: Exception type if an exception occurred
@@ -68,14 +96,14 @@ class ExecuteQuery:
         """
         if self.cursor:
             self.cursor.close()
-        if self.connection:
+        # A SELECT opens no transaction, so there is nothing to commit or roll back
+        if self.connection and not self.is_select:
             if exc_type is None:
                 # No exception occurred, commit any pending transactions
                 self.connection.commit()
             else:
                 # Exception occurred, rollback any pending transactions
                 self.connection.rollback()
-            self.connection.close()
         
         # Return False to propagate any exceptions
         return False
@@ -88,8 +116,10 @@ def main():
     # Create a sample database and table for testing
     try:
         # First, create the database and users table
-        conn = sqlite3.connect('example.db')
+        # Manage the transaction explicitly: take the write lock once for the whole setup
+        conn = sqlite3.connect('example.db', isolation_level=None)
         cursor = conn.cursor()
+        cursor.execute("BEGIN IMMEDIATE")
         
         # Create users table if it doesn't exist
         cursor.execute('''
@@ -113,11 +143,11 @@ def main():
         ]
         
         cursor.executemany('''
-            INSERT OR REPLACE INTO users (id, name, age, email) 
+            INSERT OR IGNORE INTO users (id, name, age, email) 
             VALUES (?, ?, ?, ?)
         ''', sample_users)
         
-        conn.commit()
+        cursor.execute("COMMIT")
         conn.close()
         
         # Now use our ExecuteQuery context manager
@@ -7,42 +7,76 @@ import asyncio
 import aiosqlite
 import sqlite3
 
+from db_utils import PRAGMAS
 
-async def async_fetch_users():
+
+# Rows moved from aiosqlite's worker thread per fetchmany() call
+FETCH_SIZE = 250
+
+
+async def async_stream_users(db):
+    """
+    Asynchronously stream all users from the database.
+    Rows cross from aiosqlite's worker thread in chunks of FETCH_SIZE
+    rather than one future per row.
+    
+    Args:
+        db (aiosqlite.Connection): Open database connection
+    
+    Yields:
+        tuple: One user row at a time
+    """
+    cursor = await db.execute("SELECT * FROM users")
+    try:
+        while True:
+            rows = await cursor.fetchmany(FETCH_SIZE)
+            if not rows:
+                return
+            for row in rows:
+                yield row
+    finally:
+        await cursor.close()
+
+
+async def async_fetch_users(db):
     """
     Asynchronously fetch all users from the database.
     
+    Args:
+        db (aiosqlite.Connection): Open connection shared with other fetchers
+    
     Returns:
         list: List of all users in the database
     """
     try:
-        async with aiosqlite.connect('example.db') as db:
-            cursor = await db.execute("SELECT * FROM users")
-            results = await cursor.fetchall()
-            print("async_fetch_users() - Fetching all users:")
-            for row in results:
-                print(f"  ID: {row[0]}, Name: {row[1]}, Age: {row[2]}, Email: {row[3]}")
-            return results
+        cursor = await db.execute("SELECT * FROM users")
+        results = await cursor.fetchall()
+        print("async_fetch_users() - Fetching all users:")
+        for row in results:
+            print(f"  ID: {row[0]}, Name: {row[1]}, Age: {row[2]}, Email: {row[3]}")
+        return results
     except Exception as e:
         print(f"Error in async_fetch_users: {e}")
         return []
 
 
-async def async_fetch_older_users():
+async def async_fetch_older_users(db):
     """
     Asynchronously fetch users older than 40 from the database.
     
+    Args:
+        db (aiosqlite.Connection): Open connection shared with other fetchers
+    
     Returns:
         list: List of users older than 40
     """
     try:
-        async with aiosqlite.connect('example.db') as db:
-            cursor = await db.execute("SELECT * FROM users WHERE age > ?", (40,))
-            results = await cursor.fetchall()
-            print("async_fetch_older_users() - Fetching users older than 40:")
-            for row in results:
-                print(f"  ID: {row[0]}, Name: {row[1]}, Age: {row[2]}, Email: {row[3]}")
-            return results
+        cursor = await db.execute("SELECT * FROM users WHERE age > ?", (40,))
+        results = await cursor.fetchall()
+        print("async_fetch_older_users() - Fetching users older than 40:")
+        for row in results:
+            print(f"  ID: {row[0]}, Name: {row[1]}, Age: {row[2]}, Email: {row[3]}")
+        return results
     except Exception as e:
         print(f"Error in async_fetch_older_users: {e}")
         return []
@@ -58,12 +92,16 @@ async def fetch_concurrently():
     print("Starting concurrent database queries...")
     print("=" * 50)
     
-    # Use asyncio.gather to run both queries concurrently
+    # Use asyncio.gather to run both queries concurrently over one shared
+    # connection (one worker thread and one warm page cache instead of two)
     try:
-        all_users, older_users = await asyncio.gather(
-            async_fetch_users(),
-            async_fetch_older_users()
-        )
+        async with aiosqlite.connect('example.db') as db:
+            for pragma in PRAGMAS:
+                await db.execute("PRAGMA " + pragma)
+            all_users, older_users = await asyncio.gather(
+                async_fetch_users(db),
+                async_fetch_older_users(db)
+            )
         
         print("=" * 50)
         print("Concurrent queries completed successfully!")
@@ -83,7 +121,12 @@ def setup_database():
     """
     try:
         conn = sqlite3.connect('example.db')
+        for pragma in PRAGMAS:
+            conn.execute("PRAGMA " + pragma)
+        # Manage the transaction explicitly: take the write lock once for the whole setup
+        conn.isolation_level = None
         cursor = conn.cursor()
+        cursor.execute("BEGIN IMMEDIATE")
         
         # Create users table if it doesn't exist
         cursor.execute('''
@@ -110,11 +153,11 @@ def setup_database():
         ]
         
         cursor.executemany('''
-            INSERT OR REPLACE INTO users (id, name, age, email) 
+            INSERT OR IGNORE INTO users (id, name, age, email) 
             VALUES (?, ?, ?, ?)
         ''', sample_users)
         
-        conn.commit()
+        cursor.execute("COMMIT")
         conn.close()
         print("Database setup completed successfully!")
         print("-" * 30)
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+SQLite connection settings and the per-thread connection cache shared by
+the scripts in this directory
+"""
+
+import sqlite3
+import threading
+
+
+# Connection tuning applied once per connection: WAL lets readers and the
+# writer proceed together, synchronous=NORMAL drops the per-commit fsync
+PRAGMAS = (
+    "journal_mode=WAL",
+    "synchronous=NORMAL",
+    "temp_store=memory",
+    "cache_size=-64000",
+    "busy_timeout=5000",
+)
+
+# Compiled statements sqlite3 keeps per connection, keyed by SQL text
+STATEMENT_CACHE_SIZE = 256
+
+# Per-thread cache of open connections keyed by database name, so each
+# connection's statement cache and page cache survive between uses.
+# sqlite3 connections may only be used by the thread that created them.
+_local = threading.local()
+
+
+def connect(database_name):
+    """Open a connection to database_name with PRAGMAS applied"""
+    connection = sqlite3.connect(database_name, cached_statements=STATEMENT_CACHE_SIZE)
+    for pragma in PRAGMAS:
+        connection.execute("PRAGMA " + pragma)
+    return connection
+
+
+def get_connection(database_name):
+    """
+    Return this thread's cached connection to database_name,
+    opening it on first use.
+    
+    Args:
+        database_name (str): The name/path of the database file
+    
+    Returns:
+        sqlite3.Connection: A connection reused across calls on this thread
+    """
+    connections = getattr(_local, 'connections', None)
+    if connections is None:
+        connections = _local.connections = {}
+    
+    connection = connections.get(database_name)
+    if connection is None:
+        connection = connections[database_name] = connect(database_name)
+    return connection
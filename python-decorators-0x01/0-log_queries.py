@@ -1,6 +1,8 @@
 import sqlite3
 import functools
-from datetime import datetime
+import time
+
+from sql_utils import looks_like_sql
 
 def log_queries(func):
     """Decorator to log SQL queries before executing them"""
@@ -13,11 +15,11 @@ def log_queries(func):
             query = kwargs['query']
         elif args:
             # Check if first argument looks like a SQL query
-            if isinstance(args[0], str) and any(keyword in args[0].upper() for keyword in ['SELECT', 'INSERT', 'UPDATE', 'DELETE']):
+            if looks_like_sql(args[0]):
                 query = args[0]
         
         if query:
-            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            timestamp = time.strftime("%Y-%m-%d %H:%M:%S")
             print(f"[{timestamp}] Executing SQL Query: {query}")
         
         return func(*args, **kwargs)
@@ -1,53 +1,112 @@
 import time
 import sqlite3 
 import functools
+import threading
+import weakref
+from collections import OrderedDict
+
+from sql_utils import looks_like_sql
+
+# Per-thread persistent connection; sqlite3 connections stay on their creating thread
+_local = threading.local()
+
+class _ConnectionHolder:
+    """Thread-local owner of a connection; collecting it closes the connection"""
+    __slots__ = ("conn", "__weakref__")
+
+    def __init__(self, conn):
+        self.conn = conn
+
+_PRAGMAS = (
+    "journal_mode=WAL",
+    "synchronous=NORMAL",
+    "temp_store=memory",
+    "cache_size=-20000",
+    "busy_timeout=5000",
+)
+
+def _get_connection():
+    """Return this thread's connection to users.db, opening and tuning it on first use"""
+    holder = getattr(_local, "holder", None)
+    if holder is None:
+        # The finalizer may run on another thread, hence check_same_thread=False;
+        # the connection itself is still only used by the thread that opened it
+        conn = sqlite3.connect('users.db', check_same_thread=False)
+        for pragma in _PRAGMAS:
+            conn.execute("PRAGMA " + pragma)
+        holder = _local.holder = _ConnectionHolder(conn)
+        # Closed when the owning thread exits, or at interpreter exit for live threads
+        weakref.finalize(holder, conn.close)
+    return holder.conn
 
 def with_db_connection(func):
-    """Decorator that automatically handles database connection opening and closing"""
+    """Decorator that passes a reused database connection to the function"""
     @functools.wraps(func)
     def wrapper(*args, **kwargs):
-        # Open database connection
-        conn = sqlite3.connect('users.db')
-        try:
-            # Call the original function with connection as first argument
-            result = func(conn, *args, **kwargs)
-            return result
-        finally:
-            # Always close the connection
-            conn.close()
+        # Call the original function with connection as first argument
+        return func(_get_connection(), *args, **kwargs)
     return wrapper
 
-query_cache = {}
+# Bounded LRU of query results, shared across threads
+QUERY_CACHE_SIZE = 128
+query_cache = OrderedDict()
+_query_cache_lock = threading.Lock()
+
+def _freeze(value):
+    """Turn parameters into a hashable cache key part, recursing into containers"""
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+    if isinstance(value, (set, frozenset)):
+        return frozenset(_freeze(item) for item in value)
+    try:
+        hash(value)
+    except TypeError:
+        return repr(value)
+    return value
 
 def cache_query(func):
-    """Decorator that caches query results based on the SQL query string"""
+    """Decorator that caches query results based on the SQL query string and its parameters"""
     @functools.wraps(func)
     def wrapper(*args, **kwargs):
-        # Extract the query string to use as cache key
-        cache_key = None
-        
-        # Look for 'query' in kwargs
-        if 'query' in kwargs:
-            cache_key = kwargs['query']
-        else:
+        # Extract the query string and any parameters to use as cache key
+        query = kwargs.get('query')
+        params = tuple(sorted((k, _freeze(v)) for k, v in kwargs.items() if k != 'query'))
+        if query is None:
             # Look for query in args (assuming it's the second argument after conn)
-            for arg in args[1:]:  # Skip the connection argument
-                if isinstance(arg, str) and any(keyword in arg.upper() for keyword in ['SELECT', 'INSERT', 'UPDATE', 'DELETE']):
-                    cache_key = arg
+            for index, arg in enumerate(args[1:], start=1):  # Skip the connection argument
+                if looks_like_sql(arg):
+                    query = arg
+                    params = _freeze(args[index + 1:]) + params
                     break
         
+        cache_key = None
+        if query is not None:
+            # Exact query text: case and spacing can matter inside string literals
+            cache_key = (query, params)
+        
         # If we found a query and it's in cache, return cached result
-        if cache_key and cache_key in query_cache:
-            print(f"Cache hit for query: {cache_key}")
-            return query_cache[cache_key]
+        if cache_key is not None:
+            with _query_cache_lock:
+                if cache_key in query_cache:
+                    query_cache.move_to_end(cache_key)
+                    print(f"Cache hit for query: {query}")
+                    rows, as_list = query_cache[cache_key]
+                    return list(rows) if as_list else rows
         
         # Execute the function and cache the result
         result = func(*args, **kwargs)
         
-        # Cache the result if we have a cache key
-        if cache_key:
-            print(f"Caching result for query: {cache_key}")
-            query_cache[cache_key] = result
+        # Cache row lists/tuples only (not rowcounts or other scalars); rows are
+        # stored as a tuple and lists handed out fresh so callers cannot mutate the cache
+        if cache_key is not None and isinstance(result, (list, tuple)):
+            print(f"Caching result for query: {query}")
+            with _query_cache_lock:
+                query_cache[cache_key] = (tuple(result), isinstance(result, list))
+                query_cache.move_to_end(cache_key)
+                if len(query_cache) > QUERY_CACHE_SIZE:
+                    query_cache.popitem(last=False)
         
         return result
     return wrapper
@@ -59,8 +118,9 @@ def fetch_users_with_cache(conn, query):
     cursor.execute(query)
     return cursor.fetchall()
 
-# First call will cache the result
-users = fetch_users_with_cache(query="SELECT * FROM users")
-
-# Second call will use the cached result
-users_again = fetch_users_with_cache(query="SELECT * FROM users")
+if __name__ == "__main__":
+    # First call will cache the result
+    users = fetch_users_with_cache(query="SELECT * FROM users")
+    
+    # Second call will use the cached result
+    users_again = fetch_users_with_cache(query="SELECT * FROM users")
@@ -0,0 +1,7 @@
+"""Helpers shared by the query decorators in this directory"""
+
+_SQL_VERBS = frozenset(("SELECT", "INSERT", "UPDATE", "DELETE"))
+
+def looks_like_sql(value):
+    """Check the leading keyword only, instead of upper-casing and scanning the whole string"""
+    return isinstance(value, str) and value.lstrip()[:6].upper() in _SQL_VERBS
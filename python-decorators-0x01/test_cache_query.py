@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the cache_query decorator in 4-cache_query.py
+"""
+import contextlib
+import importlib.util
+import io
+import os
+import unittest
+from unittest import mock
+
+
+def load_cache_query_module():
+    """Import 4-cache_query.py, whose file name is not a valid module name"""
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), '4-cache_query.py')
+    spec = importlib.util.spec_from_file_location('cache_query', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class TestCacheQuery(unittest.TestCase):
+    """Test cases for the cache_query decorator."""
+
+    def setUp(self):
+        """Load a fresh module (and cache) and wrap two fake query functions."""
+        self.module = load_cache_query_module()
+        self.calls = []
+
+        @self.module.cache_query
+        def fetch(conn, query, *params):
+            self.calls.append((query, params))
+            return [(len(self.calls),)]
+
+        @self.module.cache_query
+        def execute(conn, query, *params):
+            self.calls.append((query, params))
+            return 1
+
+        self.fetch = fetch
+        self.execute = execute
+
+    def run_quietly(self, func, *args):
+        """Call func without a connection, hiding the cache hit/miss prints."""
+        with contextlib.redirect_stdout(io.StringIO()):
+            return func(None, *args)
+
+    def test_repeated_query_is_served_from_cache(self):
+        """Test an identical query is answered from the cache."""
+        first = self.run_quietly(self.fetch, "SELECT * FROM users")
+        second = self.run_quietly(self.fetch, "SELECT * FROM users")
+        self.assertEqual(first, second)
+        self.assertEqual(len(self.calls), 1)
+
+    def test_string_literals_are_not_case_folded(self):
+        """Test queries differing only inside a string literal get separate entries."""
+        alice = self.run_quietly(self.fetch, "SELECT * FROM users WHERE name = 'Alice'")
+        lower = self.run_quietly(self.fetch, "SELECT * FROM users WHERE name = 'alice'")
+        self.assertNotEqual(alice, lower)
+        self.assertEqual(len(self.calls), 2)
+
+    def test_parameters_are_part_of_the_key(self):
+        """Test different parameters do not share a cache entry."""
+        self.run_quietly(self.fetch, "SELECT * FROM users WHERE age > ?", 25)
+        self.run_quietly(self.fetch, "SELECT * FROM users WHERE age > ?", 30)
+        self.assertEqual(len(self.calls), 2)
+
+    def test_list_parameters_are_accepted(self):
+        """Test unhashable list parameters are frozen into the key."""
+        self.run_quietly(self.fetch, "SELECT * FROM users WHERE id IN (?, ?)", [1, 2])
+        self.run_quietly(self.fetch, "SELECT * FROM users WHERE id IN (?, ?)", [1, 2])
+        self.assertEqual(len(self.calls), 1)
+
+    def test_non_row_results_are_returned_and_not_cached(self):
+        """Test rowcounts are passed through and never cached."""
+        self.assertEqual(self.run_quietly(self.execute, "UPDATE users SET age = 1"), 1)
+        self.assertEqual(self.run_quietly(self.execute, "UPDATE users SET age = 1"), 1)
+        self.assertEqual(len(self.calls), 2)
+
+    def test_cached_rows_cannot_be_mutated_by_callers(self):
+        """Test callers receive copies of the cached rows."""
+        self.run_quietly(self.fetch, "SELECT * FROM users").append("junk")
+        self.assertEqual(self.run_quietly(self.fetch, "SELECT * FROM users"), [(1,)])
+
+    def test_least_recently_used_entry_is_evicted(self):
+        """Test the least recently used entry is dropped once the cache is full."""
+        with mock.patch.object(self.module, 'QUERY_CACHE_SIZE', 2):
+            self.run_quietly(self.fetch, "SELECT 1")
+            self.run_quietly(self.fetch, "SELECT 2")
+            self.run_quietly(self.fetch, "SELECT 1")  # hit; SELECT 2 is now oldest
+            self.run_quietly(self.fetch, "SELECT 3")  # evicts SELECT 2
+
+            self.assertEqual(len(self.module.query_cache), 2)
+            self.run_quietly(self.fetch, "SELECT 1")
+            self.assertEqual(len(self.calls), 3)
+            self.run_quietly(self.fetch, "SELECT 2")
+            self.assertEqual(len(self.calls), 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,7 +2,10 @@
 """
 Generator that streams rows from an SQL database one by one.
 """
-from seed import connect_to_prodev
+from seed import connect_to_prodev, close_quietly, UserRow, USER_COLUMNS
+
+# Rows pulled from the server per fetchmany() call
+FETCH_SIZE = 250
 
 
 def stream_users():
@@ -10,21 +13,23 @@ def stream_users():
     Fetches rows one by one from the user_data table using a generator.
     
     Yields:
-        dict: A dictionary containing user data (user_id, name, email, age)
+        UserRow: A named tuple of user data (user_id, name, email, age)
     """
     connection = connect_to_prodev()
     if connection:
         try:
-            cursor = connection.cursor(dictionary=True)
-            cursor.execute("SELECT * FROM user_data")
+            cursor = connection.cursor()
+            cursor.arraysize = FETCH_SIZE
+            cursor.execute(f"SELECT {USER_COLUMNS} FROM user_data")
             
-            # Yield each row one by one
-            for row in cursor:
-                yield row
+            # Fetch rows in chunks, then yield each row one by one
+            while True:
+                rows = cursor.fetchmany(FETCH_SIZE)
+                if not rows:
+                    break
+                yield from map(UserRow._make, rows)
                 
         except Exception as e:
             print(f"Error streaming users: {e}")
         finally:
-            if connection.is_connected():
-                cursor.close()
-                connection.close()
+            close_quietly(cursor, connection)
@@ -2,14 +2,17 @@
 """
 Batch processing of large data using generators.
 """
-from seed import connect_to_prodev
+from seed import connect_to_prodev, close_quietly, UserRow, USER_COLUMNS
 
-def stream_users_in_batches(batch_size):
+def stream_users_in_batches(batch_size, where=None, params=()):
     """
     Fetches rows in batches from the user_data table.
     
     Args:
         batch_size (int): Number of records to fetch in each batch
+        where (str): Optional SQL condition with %s placeholders, applied
+            by the database so only matching rows are sent
+        params (tuple): Values for the placeholders in where
         
     Yields:
         list: A batch of user records
@@ -17,25 +20,31 @@ def stream_users_in_batches(batch_size):
     connection = connect_to_prodev()
     if connection:
         try:
-            cursor = connection.cursor(dictionary=True)
-            offset = 0
+            # Prepared cursor: the query is PREPAREd once and only EXECUTEd per batch
+            cursor = connection.cursor(prepared=True)
+            # Keyset pagination: seek past the last user_id instead of
+            # re-scanning OFFSET rows ('' sorts before any uuid)
+            last_id = ''
+            condition = f"({where}) AND user_id > %s" if where else "user_id > %s"
+            query = (
+                f"SELECT {USER_COLUMNS} FROM user_data "
+                f"WHERE {condition} ORDER BY user_id LIMIT %s"
+            )
             
             while True:
-                cursor.execute(f"SELECT * FROM user_data LIMIT {batch_size} OFFSET {offset}")
-                batch = cursor.fetchall()
+                cursor.execute(query, (*params, last_id, batch_size))
+                batch = [UserRow._make(row) for row in cursor.fetchall()]
                 
                 if not batch:
                     break
                     
                 yield batch
-                offset += batch_size
+                last_id = batch[-1].user_id
                 
         except Exception as e:
             print(f"Error streaming users in batches: {e}")
         finally:
-            if connection.is_connected():
-                cursor.close()
-                connection.close()
+            close_quietly(cursor, connection)
 
 def batch_processing():
     """
@@ -47,13 +56,9 @@ def batch_processing():
     batch_size = 100  # Default batch size
     
     def user_generator():
-        # Get batches of users
-        for batch in stream_users_in_batches(batch_size):
-            # Process each user in the batch
-            for user in batch:
-                # Filter users over age 25
-                if user['age'] > 25:
-                    yield user
+        # The database filters users over age 25, so every row in a batch matches
+        for batch in stream_users_in_batches(batch_size, where="age > %s", params=(25,)):
+            yield from batch
     
     return user_generator()
 
@@ -2,7 +2,7 @@
 """
 Lazy loading paginated data from database using generators.
 """
-from seed import connect_to_prodev
+from seed import connect_to_prodev, UserRow, USER_COLUMNS
 
 
 def paginate_users(page_size, offset):
@@ -17,13 +17,38 @@ def paginate_users(page_size, offset):
         list: A list of user records for the requested page
     """
     connection = connect_to_prodev()
-    cursor = connection.cursor(dictionary=True)
-    cursor.execute(f"SELECT * FROM user_data LIMIT {page_size} OFFSET {offset}")
-    rows = cursor.fetchall()
+    cursor = connection.cursor()
+    cursor.execute(
+        f"SELECT {USER_COLUMNS} FROM user_data ORDER BY user_id LIMIT %s OFFSET %s",
+        (page_size, offset)
+    )
+    rows = [UserRow._make(row) for row in cursor.fetchall()]
     connection.close()
     return rows
 
 
+def paginate_users_after(cursor, page_size, last_id):
+    """
+    Fetches the page of user_data records following last_id (keyset pagination).
+    Seeks on the user_id index instead of scanning and discarding OFFSET rows.
+    
+    Args:
+        cursor: Open cursor supplied (and closed) by the caller; a prepared
+            cursor reuses the same statement for every page
+        page_size (int): Number of records per page
+        last_id (str): user_id of the last record already fetched ('' for the first page)
+        
+    Returns:
+        list: A list of user records for the requested page
+    """
+    cursor.execute(
+        f"SELECT {USER_COLUMNS} FROM user_data "
+        "WHERE user_id > %s ORDER BY user_id LIMIT %s",
+        (last_id, page_size)
+    )
+    return [UserRow._make(row) for row in cursor.fetchall()]
+
+
 def lazy_pagination(page_size):
     """
     Implements lazy loading of paginated data using a generator.
@@ -35,18 +60,25 @@ def lazy_pagination(page_size):
     Yields:
         list: A page of user records
     """
-    offset = 0
+    # One connection and one prepared statement for every page
+    connection = connect_to_prodev()
+    cursor = connection.cursor(prepared=True)
+    last_id = ''
     
-    while True:
-        # Fetch the current page of data
-        page = paginate_users(page_size, offset)
-        
-        # If page is empty, we've reached the end of the data
-        if not page:
-            break
+    try:
+        while True:
+            # Fetch the page after the last user_id seen
+            page = paginate_users_after(cursor, page_size, last_id)
             
-        # Yield the current page
-        yield page
-        
-        # Move to the next page
-        offset += page_size
+            # If page is empty, we've reached the end of the data
+            if not page:
+                break
+                
+            # Yield the current page
+            yield page
+            
+            # Move to the next page
+            last_id = page[-1].user_id
+    finally:
+        cursor.close()
+        connection.close()
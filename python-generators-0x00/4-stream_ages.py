@@ -2,7 +2,10 @@
 """
 Memory-efficient aggregation using generators to calculate average age.
 """
-from seed import connect_to_prodev
+from seed import connect_to_prodev, close_quietly
+
+# Rows pulled from the server per fetchmany() call
+FETCH_SIZE = 1000
 
 
 def stream_user_ages():
@@ -16,18 +19,21 @@ def stream_user_ages():
     if connection:
         try:
             cursor = connection.cursor()
+            cursor.arraysize = FETCH_SIZE
             cursor.execute("SELECT age FROM user_data")
             
-            # Yield each age one by one
-            for (age,) in cursor:
-                yield age
+            # Fetch ages in chunks, then yield each age one by one
+            while True:
+                rows = cursor.fetchmany(FETCH_SIZE)
+                if not rows:
+                    break
+                for (age,) in rows:
+                    yield age
                 
         except Exception as e:
             print(f"Error streaming ages: {e}")
         finally:
-            if connection.is_connected():
-                cursor.close()
-                connection.close()
+            close_quietly(cursor, connection)
 
 
 def calculate_average_age():
@@ -50,5 +56,28 @@ def calculate_average_age():
         print("No users found")
 
 
+def calculate_average_age_fast():
+    """
+    Calculate the average age with a single aggregate query, so only one
+    row leaves the database.
+    """
+    connection = connect_to_prodev()
+    if connection:
+        try:
+            cursor = connection.cursor()
+            cursor.execute("SELECT AVG(age), COUNT(*) FROM user_data")
+            average_age, count = cursor.fetchone()
+            
+            if count:
+                print(f"Average age of users: {average_age:.2f}")
+            else:
+                print("No users found")
+                
+        except Exception as e:
+            print(f"Error calculating average age: {e}")
+        finally:
+            close_quietly(cursor, connection)
+
+
 if __name__ == "__main__":
     calculate_average_age()
@@ -6,8 +6,18 @@ Creates database, tables, and populates with sample data.
 import mysql.connector
 import csv
 import os
+from collections import namedtuple
+from itertools import islice
 from mysql.connector import Error
 
+# user_data columns in select order, and the lightweight row type the
+# streaming helpers build from plain tuple cursors (cheaper than dict rows)
+USER_COLUMNS = "user_id, name, email, age"
+UserRow = namedtuple('UserRow', USER_COLUMNS)
+
+# Rows sent per executemany() call when seeding
+INSERT_BATCH_SIZE = 1000
+
 
 def connect_db():
     """Connects to the MySQL database server"""
@@ -48,6 +58,16 @@ def connect_to_prodev():
         return None
 
 
+def close_quietly(*resources):
+    """Closes cursors/connections, ignoring errors from ones already closed"""
+    # close() is local and idempotent; is_connected() would ping the server
+    for resource in resources:
+        try:
+            resource.close()
+        except Exception:
+            pass
+
+
 def create_table(connection):
     """Creates user_data table if it doesn't exist"""
     try:
@@ -79,23 +99,25 @@ def insert_data(connection, data_file):
             print(f"Error: File {data_file} does not exist")
             return
         
-        # Read data from CSV and insert into table
+        # Existing user_ids are skipped by the PRIMARY KEY (INSERT IGNORE),
+        # so no per-row existence check is needed
+        insert_query = """
+        INSERT IGNORE INTO user_data (user_id, name, email, age)
+        VALUES (%s, %s, %s, %s)
+        """
+        
+        # Read data from CSV and insert into table in batches, one commit at the end
         with open(data_file, 'r') as file:
             csv_reader = csv.reader(file)
             next(csv_reader)  # Skip header row
             
-            for row in csv_reader:
-                # Check if record already exists
-                check_query = "SELECT user_id FROM user_data WHERE user_id = %s"
-                cursor.execute(check_query, (row[0],))
-                result = cursor.fetchone()
-                
-                if not result:
-                    insert_query = """
-                    INSERT INTO user_data (user_id, name, email, age)
-                    VALUES (%s, %s, %s, %s)
-                    """
-                    cursor.execute(insert_query, (row[0], row[1], row[2], int(row[3])))
+            rows = ((row[0], row[1], row[2], int(row[3])) for row in csv_reader)
+            connection.start_transaction()
+            while True:
+                batch = list(islice(rows, INSERT_BATCH_SIZE))
+                if not batch:
+                    break
+                cursor.executemany(insert_query, batch)
             
             connection.commit()
         cursor.close()